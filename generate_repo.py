@@ -23,10 +23,31 @@ Usage:
     python generate_repo.py --input ~/pkg --release v1.0
 """
 
-import argparse, datetime, glob, gzip, hashlib, json
-import os, re, shutil, subprocess, sys
+import argparse, concurrent.futures, datetime, hashlib
+import io, itertools, json, mmap, os, re, shutil, subprocess, sys, tarfile
+import threading, zlib
 from pathlib import Path
 
+try:
+    import zstandard  # optional: in-process control.tar.zst support
+except ImportError:
+    zstandard = None
+
+try:
+    import xxhash     # optional: fast content fingerprint for the index cache
+except ImportError:
+    xxhash = None
+
+try:
+    from isal import isal_zlib  # optional: ISA-L deflate for Packages.gz (levels 0-3)
+except ImportError:
+    isal_zlib = None
+
+try:
+    import orjson     # optional: fast JSON encoding for packages.json / release.json
+except ImportError:
+    orjson = None
+
 # Config
 ORIGIN       = "AndroStudio"
 LABEL        = "AndroStudio Package Repository"
@@ -35,40 +56,165 @@ SUITE        = "stable"
 COMPONENT    = "main"
 DESCRIPTION  = "Official AndroStudio terminal package repository"
 SUPPORTED_ARCHES = ['all', 'arm', 'i686', 'aarch64', 'x86_64', 'arm64', 'amd64']
-HASHES       = ['md5', 'sha256']
+HASHES       = ['sha256']   # apt >= 0.8 needs nothing else; MD5 only cost a second digest
+GZIP_LEVEL   = 6   # Packages.gz: 9 costs 2-3x the CPU for <1% smaller text
+PIGZ         = shutil.which('pigz')  # parallel gzip, used when installed
 
 # GitHub repo slug — change to yours
 GH_REPO      = "devjhr/pkg-repo"
 
+# Hash read size: big enough that read() syscalls and loop overhead vanish
+HASH_BUFSIZE    = 4 * 1024 * 1024  # 4 MB
+# Files >= this size are hashed through mmap, one thread per algo (smaller: not worth the setup)
+HASH_MMAP_MIN   = 8 * 1024 * 1024  # 8 MB
+
+# Per-deb control fields + hash cache, relative to repo root (keep it out of git)
+INDEX_CACHE  = '.repo-cache.json'
+# Cache-only content fingerprint: lets a deb whose mtime changed but bytes
+# didn't (fresh git checkout, touch) skip hashing + control extraction
+FINGERPRINT  = ['xxh3'] if xxhash else []
+
 # Files >= this size are expected to be in GitHub Releases
 LARGE_FILE_THRESHOLD = 90 * 1024 * 1024  # 90 MB
 
+# .deb = ar archive; tarfile mode for each control archive flavour
+AR_MAGIC     = b'!<arch>\n'
+CONTROL_TARS = {
+    'control.tar.gz':  'r:gz',
+    'control.tar.xz':  'r:xz',
+    'control.tar.zst': 'r|',   # fed through zstandard
+    'control.tar':     'r:',   # uncompressed (dpkg-deb -Znone)
+}
+
+# Packages entry layout: these control fields first, in this order, then the rest
+PRIORITY_KEYS = [
+    'Package', 'Version', 'Architecture', 'Maintainer',
+    'Installed-Size', 'Depends', 'Pre-Depends', 'Recommends',
+    'Suggests', 'Conflicts', 'Breaks', 'Replaces', 'Provides',
+    'Homepage', 'Description'
+]
+PRIORITY_IDX = {k: i for i, k in enumerate(PRIORITY_KEYS)}
+# Fields we compute ourselves — never copied over from the control file
+COMPUTED = frozenset({'Filename', 'Size', 'MD5Sum', 'SHA256', 'MD5sum', 'SHA1', 'SHA512'})
+
+# One control field: "Key: value" plus any indented continuation lines
+_CTRL_RE = re.compile(rb'^([^\s:#-][^\s:]*):[ \t]*(.*(?:\n[ \t].*)*)', re.MULTILINE)
+
 
 def run(cmd):
+    """Run argv list cmd directly (no shell). Returns stripped stdout, or None on failure."""
     try:
-        return subprocess.check_output(cmd, shell=True, universal_newlines=True,
-                                       stderr=subprocess.DEVNULL).strip()
-    except subprocess.CalledProcessError:
+        return subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL).strip()
+    except (subprocess.CalledProcessError, OSError):
         return None
 
 
-def hash_file(path, algo):
-    h = hashlib.new(algo)
-    with open(path, 'rb') as f:
-        for chunk in iter(lambda: f.read(65536), b''):
-            h.update(chunk)
-    return h.hexdigest()
+def new_hasher(algo):
+    """hashlib hasher for algo, or xxhash's xxh3_64 for the 'xxh3' fingerprint."""
+    return xxhash.xxh3_64() if algo == 'xxh3' else hashlib.new(algo)
+
+
+def hash_file_multi(path, algos, st=None):
+    """Hash a file with every algo in one read pass. Returns { algo: hexdigest }.
+    st is the file's stat result if the caller already has it (saves an fstat)."""
+    # Unbuffered: we read into our own buffer, no need for a second copy
+    with open(path, 'rb', buffering=0) as f:
+        hashers = [new_hasher(a) for a in algos]
+        size    = (st or os.fstat(f.fileno())).st_size
+        _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')  # bigger readahead
+        mm      = None
+        if size >= HASH_MMAP_MIN:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError, OverflowError):
+                pass  # e.g. > address space on 32-bit: plain reads below
+        if mm is not None:
+            # Whole file in one update per hasher: no read() copies, no Python
+            # loop, and hashlib drops the GIL — so with several algos each one
+            # gets its own thread/core over the same mapping
+            with mm:
+                threads = [threading.Thread(target=h.update, args=(mm,)) for h in hashers[1:]]
+                for t in threads:
+                    t.start()
+                hashers[0].update(mm)
+                for t in threads:
+                    t.join()
+        else:
+            # Same loop as hashlib.file_digest, but with our (larger) buffer
+            buf  = bytearray(min(HASH_BUFSIZE, size + 1))
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                for h in hashers:
+                    h.update(view[:n])
+        if size >= HASH_MMAP_MIN:
+            # Read once and done with: don't let big debs push useful pages out of cache
+            _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+    return {a: h.hexdigest() for a, h in zip(algos, hashers)}
+
+
+def _fadvise(fd, advice):
+    """os.posix_fadvise(fd, 0, 0, os.<advice>) where available (not Windows/macOS).
+    Only a hint, so failures are ignored."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+        except OSError:
+            pass
+
+
+def write_atomic(path, data):
+    """Write bytes to path via a sibling .tmp file + rename, so readers
+    (and a crash mid-write) never see a half-written file."""
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def write_gzip(path, data, level=GZIP_LEVEL):
+    """Write data gzip-compressed to path (atomically, like write_atomic),
+    with no name/mtime in the header. Uses pigz across all cores when installed,
+    else ISA-L (isal) or zlib in-process. ISA-L only has levels 0-3, so it is
+    used for those; higher levels go to zlib."""
+    if PIGZ:
+        tmp = path.with_name(path.name + '.tmp')
+        try:
+            with open(tmp, 'wb') as out:
+                r = subprocess.run([PIGZ, f'-{level}', '-n', '-c', '-p', str(os.cpu_count() or 1)],
+                                   input=data, stdout=out, stderr=subprocess.DEVNULL)
+            if r.returncode == 0:
+                tmp.replace(path)
+                return
+        except OSError:
+            pass
+    # wbits=31 makes zlib emit a gzip stream directly, without GzipFile's overhead
+    if isal_zlib is not None and level <= isal_zlib.ISAL_BEST_COMPRESSION:
+        co = isal_zlib.compressobj(level, isal_zlib.DEFLATED, 31)
+    else:
+        co = zlib.compressobj(level, zlib.DEFLATED, 31)
+    write_atomic(path, co.compress(data) + co.flush())
+
+
+def dump_json(obj, pretty=False):
+    """Encode obj as UTF-8 JSON bytes, compact or indented by 2.
+    Uses orjson when installed, else the stdlib json module."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
 
 
 def hash_label(algo):
     return 'MD5Sum' if algo == 'md5' else algo.upper()
 
 
-def control_file_contents(debfile):
-    """Extract control file from .deb using ar+tar. Supports gz/xz/zst."""
-    file_list = run(f"ar t {debfile}")
+def control_file_contents(debfile, log=None):
+    """Extract control file from .deb using ar+tar. Supports gz/xz/zst.
+    Fallback for read_deb_control when zstandard is not installed.
+    Warnings go to log (default: stdout)."""
+    file_list = run(['ar', 't', debfile])
     if file_list is None:
-        print(f"  WARNING: Cannot list contents of '{os.path.basename(debfile)}' - skipping")
+        print(f"  WARNING: Cannot list contents of '{os.path.basename(debfile)}' - skipping", file=log)
         return None
 
     file_list = file_list.split('\n')
@@ -79,40 +225,92 @@ def control_file_contents(debfile):
         ctrl, flag = 'control.tar.xz', '-J'
     elif 'control.tar.zst' in file_list:
         ctrl, flag = 'control.tar.zst', '--zstd'
+    elif 'control.tar' in file_list:
+        ctrl, flag = 'control.tar', '--no-auto-compress'
     else:
-        print(f"  WARNING: No control archive in '{os.path.basename(debfile)}' - skipping")
+        print(f"  WARNING: No control archive in '{os.path.basename(debfile)}' - skipping", file=log)
         return None
 
-    contents = run(f"ar p {debfile} {ctrl} | tar -O {flag} -xf - ./control")
-    if contents is None:
-        print(f"  WARNING: Failed to extract control from '{os.path.basename(debfile)}' - skipping")
+    # ar p DEB CTRL | tar -O FLAG -xf - ./control, without a shell in between
+    try:
+        ar  = subprocess.Popen(['ar', 'p', debfile, ctrl],
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        tar = subprocess.Popen(['tar', '-O', flag, '-xf', '-', './control'], stdin=ar.stdout,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        ar.stdout.close()  # tar owns the pipe now
+        contents, _ = tar.communicate()
+        ar.wait()
+    except OSError:
+        contents = None
+    if contents is None or tar.returncode != 0:
+        print(f"  WARNING: Failed to extract control from '{os.path.basename(debfile)}' - skipping", file=log)
         return None
-    return contents
+    return contents.strip()
+
 
+def read_deb_control(debfile, log=None):
+    """Extract control file (raw bytes) from .deb in-process, no ar/tar. Supports gz/xz/zst/none.
+
+    ar layout: 8-byte magic, then per member a 60-byte header
+    (name[16] mtime[12] uid[6] gid[6] mode[8] size[10] "`\\n"), data padded to 2.
+    Warnings go to log (default: stdout).
+    """
+    name = os.path.basename(debfile)
+    try:
+        with open(debfile, 'rb') as f:
+            if f.read(8) != AR_MAGIC:
+                print(f"  WARNING: Cannot list contents of '{name}' - skipping", file=log)
+                return None
+            ctrl = None
+            while len(header := f.read(60)) == 60:
+                member = header[:16].decode().rstrip().rstrip('/')
+                size   = int(header[48:58])
+                if member in CONTROL_TARS:
+                    ctrl, data = member, f.read(size)
+                    break
+                f.seek(size + (size & 1), os.SEEK_CUR)
+    except (OSError, ValueError):
+        print(f"  WARNING: Cannot list contents of '{name}' - skipping", file=log)
+        return None
 
-def parse_control(text):
-    """Parse control file text into a dict, handling multiline fields."""
-    info = {}
-    current_key = None
-    for line in text.splitlines():
-        if line.startswith(' ') or line.startswith('\t'):
-            if current_key:
-                info[current_key] += '\n' + line
-        elif ': ' in line:
-            key, _, val = line.partition(': ')
-            info[key.strip()] = val.strip()
-            current_key = key.strip()
-    return info
+    if ctrl is None:
+        print(f"  WARNING: No control archive in '{name}' - skipping", file=log)
+        return None
+    if ctrl == 'control.tar.zst' and zstandard is None:
+        return control_file_contents(debfile, log)
+
+    try:
+        fileobj = io.BytesIO(data)
+        if ctrl == 'control.tar.zst':
+            fileobj = zstandard.ZstdDecompressor().stream_reader(fileobj)
+        with tarfile.open(fileobj=fileobj, mode=CONTROL_TARS[ctrl]) as tf:
+            for member in tf:
+                if member.name in ('./control', 'control'):
+                    return tf.extractfile(member).read().strip()
+    except Exception:
+        pass
+    print(f"  WARNING: Failed to extract control from '{name}' - skipping", file=log)
+    return None
+
+
+def parse_control(ctrl):
+    """Parse control file bytes (or str) into a dict, handling multiline fields."""
+    if isinstance(ctrl, str):
+        ctrl = ctrl.encode('utf-8')
+    return {m.group(1).decode('utf-8'): m.group(2).decode('utf-8', 'replace').strip()
+            for m in _CTRL_RE.finditer(ctrl)}
 
 
 def fetch_release_urls(tag):
     """
     Build download URLs for all .deb assets in a GitHub Release.
-    URL format is always predictable — no JSON parsing needed:
+    URL format is always predictable:
       https://github.com/{repo}/releases/download/{tag}/{filename}
+    Returns { filename: {url, size[, sha256]} }; sha256 comes from the asset's
+    "digest" (newer gh versions), so those files need no local hashing.
     Requires: gh CLI to verify the release exists and list filenames.
     """
-    result = run(f"gh release view {tag} --repo {GH_REPO} --json assets")
+    result = run(['gh', 'release', 'view', tag, '--repo', GH_REPO, '--json', 'assets'])
     if result is None:
         print(f"  WARNING: Could not fetch release '{tag}'.")
         print(f"  Make sure: pkg install gh && gh auth login")
@@ -125,11 +323,14 @@ def fetch_release_urls(tag):
             if name.endswith('.deb'):
                 # Construct URL directly — always this format on GitHub
                 url = f"https://github.com/{GH_REPO}/releases/download/{tag}/{name}"
-                urls[name] = url
+                urls[name] = {'url': url, 'size': a.get('size')}
+                algo, _, digest = (a.get('digest') or '').partition(':')
+                if algo == 'sha256' and digest:
+                    urls[name]['sha256'] = digest
         print(f"  Found {len(urls)} .deb asset(s) in release {tag}")
-        for name, url in urls.items():
+        for name, asset in urls.items():
             print(f"    {name}")
-            print(f"    → {url}")
+            print(f"    → {asset['url']}")
         return urls
     except Exception as e:
         print(f"  WARNING: Failed to parse release assets: {e}")
@@ -147,10 +348,10 @@ def load_release_json(repo_root):
         "file": "gradle_9.3.1_all.deb",
         "url":  "https://github.com/devjhr/pkg-repo/releases/download/v1.0/gradle_9.3.1_all.deb",
         "size": 135056252,
-        "md5":  "65af3c15dc001bf29af0447441e6711a",
         "sha256": "5e9dfcd7cb5e7f224524a723033f0fa020a138c933dd538944e6cd1ec4fd9e36"
       }
     ]
+    One digest per algo in HASHES; an "md5" left in older entries is ignored.
     Run with --add-release to generate entries automatically from a .deb file.
     """
     rj = repo_root / 'release.json'
@@ -176,24 +377,23 @@ def add_to_release_json(repo_root, deb_path, url):
         return False
 
     print(f"  Computing checksums for {deb_path.name} ...")
-    size   = deb_path.stat().st_size
-    md5    = hash_file(str(deb_path), 'md5')
-    sha256 = hash_file(str(deb_path), 'sha256')
+    st      = deb_path.stat()
+    size    = st.st_size
+    digests = hash_file_multi(str(deb_path), HASHES, st)
 
     # Read control info
-    ctrl = control_file_contents(str(deb_path))
+    ctrl = read_deb_control(str(deb_path))
     info = parse_control(ctrl) if ctrl else {}
 
     entry = {
         "file":    deb_path.name,
         "url":     url,
         "size":    size,
-        "md5":     md5,
-        "sha256":  sha256,
+        **digests,
         "package": info.get('Package', deb_path.stem.split('_')[0]),
         "version": info.get('Version', ''),
         "arch":    info.get('Architecture', 'all'),
-        "control": ctrl or "",
+        "control": ctrl.decode('utf-8', 'replace') if ctrl else "",
     }
 
     rj   = repo_root / 'release.json'
@@ -214,176 +414,299 @@ def add_to_release_json(repo_root, deb_path, url):
     if not replaced:
         data.append(entry)
 
-    rj.write_text(json.dumps(data, indent=2), encoding='utf-8')
+    write_atomic(rj, dump_json(data, pretty=True))
     print(f"  {'Updated' if replaced else 'Added'} {deb_path.name} in release.json")
     print(f"    URL    : {url}")
     print(f"    Size   : {size:,} bytes ({size//1024//1024} MB)")
-    print(f"    MD5    : {md5}")
-    print(f"    SHA256 : {sha256}")
+    for algo in HASHES:
+        print(f"    {hash_label(algo):<6} : {digests[algo]}")
     return True
 
 
-def build_packages(pool_dir, repo_root, release_urls=None):
+def find_debs(root):
+    """Yield an os.DirEntry for every .deb below root (iterative scandir walk).
+    Skips dot-files/dirs like glob does. DirEntry.stat() caches its result."""
+    stack = [str(root)] if os.path.isdir(root) else []
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for e in it:
+                if e.name.startswith('.'):
+                    continue
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(e.path)
+                elif e.name.endswith('.deb'):
+                    yield e
+
+
+def deb_sort_key(entry):
+    """Sort DirEntries by path components — the same order as sorted(Paths)."""
+    return entry.path.split(os.sep)
+
+
+def load_index_cache(repo_root):
+    """Load the index cache: { relpath: {size, mtime_ns, info, hashes} }."""
+    try:
+        return json.loads((repo_root / INDEX_CACHE).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index_cache(repo_root, cache):
+    """Write the index cache atomically (tmp file + rename)."""
+    write_atomic(repo_root / INDEX_CACHE, dump_json(cache))
+
+
+def cache_hit(cached, path, st):
+    """True if an index cache record still describes the file at path.
+    Same size + mtime is trusted as is; if only the mtime moved, the contents
+    are compared through the cheap xxh3 fingerprint (when xxhash is installed).
+    """
+    if not cached or cached.get('size') != st.st_size:
+        return False
+    if cached.get('mtime_ns') == st.st_mtime_ns:
+        return True
+    fp = (cached.get('hashes') or {}).get('xxh3')
+    return bool(FINGERPRINT and fp) and hash_file_multi(path, FINGERPRINT, st)['xxh3'] == fp
+
+
+# Encoded "Key: " line prefixes, built once per field name and reused
+_FIELD_PREFIX = {}
+
+
+def _prefix(key):
+    prefix = _FIELD_PREFIX.get(key)
+    if prefix is None:
+        prefix = _FIELD_PREFIX[key] = key.encode() + b': '
+    return prefix
+
+
+def render_entry(info, filename, size, digests):
+    """Packages stanza (bytes) for one deb: its control fields — PRIORITY_KEYS
+    first, the rest in control order, COMPUTED ones dropped — then Filename,
+    Size and one line per algo in HASHES."""
+    fields = sorted((kv for kv in info.items() if kv[0] not in COMPUTED),
+                    key=lambda kv: PRIORITY_IDX.get(kv[0], len(PRIORITY_KEYS)))
+    block = []
+    for key, val in fields:
+        block += (_prefix(key), val.encode(), b'\n')
+    block += (b'Filename: ', filename.encode(), b'\nSize: ', str(size).encode(), b'\n')
+    for algo in HASHES:
+        block += (_prefix(hash_label(algo)), digests.get(algo, '').encode(), b'\n')
+    return b''.join(block)
+
+
+def process_deb(deb, pool_dir, release_urls=None, cached=None, st=None, known_hashes=None):
+    """Index a single .deb from the pool: extract control, hash, build its entry.
+    Runs in a worker (process or thread), so its output goes to a private
+    buffer that is handed back to be printed in order.
+    cached is a {size, mtime_ns, info[, hashes]} record from the index cache or
+    import_debs; if it still matches the file (see cache_hit), its parsed
+    control fields (and hashes, if present) are reused.
+    st is the deb's stat result if the caller already has it.
+    known_hashes are digests already on record for this exact file (release.json
+    or a Release asset); when they cover HASHES the file is not read for hashing
+    at all. Such borrowed digests are never put in the cache record, so a wrong
+    release.json entry can't outlive its fix.
+    Returns (log, result); result is None if the deb is skipped,
+    else (entry, (letter, pkgdir, folder_map_item), arch, cache_record, from_cache).
+    """
+    log   = io.StringIO()
+    rel   = deb.relative_to(pool_dir)
+    parts = rel.parts
+    print(f"  Pkg  {'/'.join(parts)}", file=log)
+
+    st = st or deb.stat()
+    info = digests = None
+    borrowed = False
+    from_cache = cache_hit(cached, str(deb), st)
+    if from_cache:
+        info   = cached.get('info')
+        hashes = cached.get('hashes') or {}
+        if all(algo in hashes for algo in HASHES):
+            digests = hashes
+        else:
+            from_cache = False
+    if info is None:
+        ctrl = read_deb_control(str(deb), log)
+        if ctrl is None:
+            return log.getvalue(), None
+        info = parse_control(ctrl)
+
+    pkg_name = info.get('Package', deb.stem.split('_')[0])
+    pkg_ver  = info.get('Version', '')
+    pkg_arch = info.get('Architecture', 'aarch64')
+
+    if pkg_arch not in SUPPORTED_ARCHES:
+        print(f"    WARNING: Unsupported arch '{pkg_arch}' - skipping", file=log)
+        return log.getvalue(), None
+
+    size          = st.st_size
+    is_large      = size >= LARGE_FILE_THRESHOLD
+
+    # Large files: use Release URL as Filename, will be deleted from pool/ after indexing
+    if is_large and release_urls and deb.name in release_urls:
+        filename_path = release_urls[deb.name]['url']
+        print(f"  Large {deb.name} ({size//1024//1024} MB) → Release URL", file=log)
+    else:
+        filename_path = 'pool/main/' + '/'.join(parts)
+        if is_large:
+            print(f"  Large {deb.name} ({size//1024//1024} MB) → pool/ (no release URL — add --release TAG)", file=log)
+
+    if digests is None and known_hashes and all(algo in known_hashes for algo in HASHES):
+        digests  = known_hashes
+        borrowed = True
+    if digests is None:
+        digests = hash_file_multi(str(deb), HASHES + FINGERPRINT, st)
+    # Build Packages entry — as bytes, so nothing is re-encoded when writing
+    entry = render_entry(info, filename_path, size, digests)
+
+    # packages.json map location  { "m": { "micro": [{...}] } }
+    if len(parts) >= 3:
+        letter, pkgdir = parts[0], parts[1]
+    elif len(parts) == 2:
+        letter, pkgdir = parts[0], pkg_name
+    else:
+        letter = pkg_name[0].lower() if pkg_name else '.'
+        pkgdir = pkg_name
+
+    item = {
+        'name':    deb.name,
+        'path':    filename_path,
+        'size':    size,
+        'package': pkg_name,
+        'version': pkg_ver,
+        'desc':    info.get('Description', '').split('\n')[0],
+        'release': is_large and release_urls and deb.name in release_urls,
+    }
+    record = {
+        'size':     st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'info':     info,
+    }
+    if not borrowed:
+        record['hashes'] = digests
+    return log.getvalue(), (entry, (letter, pkgdir, item), pkg_arch, record,
+                            from_cache)
+
+
+def deb_executor():
+    """Executor for process_deb: a process pool across all cores, or 4 threads
+    where processes aren't available (Android/Termux lacks a working sem_open).
+    Hashing, decompression and file reads release the GIL, so threads overlap too."""
+    try:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    except (NotImplementedError, ImportError, OSError):
+        return concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+
+def build_packages(pool_dir, repo_root, release_urls=None, gzip_level=GZIP_LEVEL,
+                   prefetched_controls=None, pretty_json=False):
     """Scan pool/main for .deb files and generate Packages, Packages.gz, packages.json.
-    release_urls: dict { filename: url } for large files manually uploaded to GitHub Releases.
+    release_urls: dict { filename: {url, size[, sha256]} } for large files manually
+    uploaded to GitHub Releases (see fetch_release_urls).
+    gzip_level: compression level for Packages.gz.
+    prefetched_controls: { path: record } from import_debs, so freshly imported
+    debs don't have their control extracted a second time.
+    pretty_json: indent packages.json for humans instead of writing it compact.
     """
     bin_dir  = repo_root / 'dists' / CODENAME / COMPONENT / 'binary-aarch64'
     pkg_file = bin_dir / 'Packages'
     pkggz    = bin_dir / 'Packages.gz'
     bin_dir.mkdir(parents=True, exist_ok=True)
 
-    # Find debs at any depth inside pool/main/
-    deb_files = sorted([
-        Path(p) for p in glob.glob(str(pool_dir / '**' / '*.deb'), recursive=True)
-    ])
+    # Find debs at any depth inside pool/main/ — the only walk of the pool
+    deb_entries = sorted(find_debs(pool_dir), key=deb_sort_key)
 
-    if not deb_files:
+    if not deb_entries:
         print("  WARNING: No .deb files found in pool/main/")
-        pkg_file.write_text('', encoding='utf-8')
     else:
-        print(f"  Found {len(deb_files)} .deb file(s)")
+        print(f"  Found {len(deb_entries)} .deb file(s)")
 
     # Remove old versions — keep only the newest .deb per package folder
     # A package folder is pool/main/m/micro/ — all debs inside are versions of same pkg
-    pkg_dirs = set(deb.parent for deb in deb_files)
-    for pkg_dir in pkg_dirs:
-        all_debs = sorted(pkg_dir.glob('*.deb'))
-        if len(all_debs) > 1:
+    by_dir = {}
+    for e in deb_entries:
+        by_dir.setdefault(os.path.dirname(e.path), []).append(e)
+    removed = set()
+    for debs in by_dir.values():
+        if len(debs) > 1:
             # Sort by modification time, keep newest
-            all_debs.sort(key=lambda f: f.stat().st_mtime)
-            for old_deb in all_debs[:-1]:
-                old_deb.unlink()
+            for old_deb in sorted(debs, key=lambda e: e.stat().st_mtime)[:-1]:
+                os.unlink(old_deb.path)
+                removed.add(old_deb.path)
                 print(f"  Removed old version: {old_deb.name}")
-            # Refresh deb_files list
-    deb_files = sorted([
-        Path(p) for p in glob.glob(str(pool_dir / '**' / '*.deb'), recursive=True)
-    ])
+    # Drop the removed ones from the list we already have instead of re-scanning
+    deb_entries = [e for e in deb_entries if e.path not in removed]
+    deb_files   = [Path(e.path) for e in deb_entries]
 
     entries           = []
     folder_map        = {}
     encountered_arches = set()
 
-    PRIORITY_KEYS = [
-        'Package', 'Version', 'Architecture', 'Maintainer',
-        'Installed-Size', 'Depends', 'Pre-Depends', 'Recommends',
-        'Suggests', 'Conflicts', 'Breaks', 'Replaces', 'Provides',
-        'Homepage', 'Description'
-    ]
-    COMPUTED = {'Filename', 'Size', 'MD5Sum', 'SHA256', 'MD5sum', 'SHA1', 'SHA512'}
-
-    for deb in deb_files:
-        rel   = deb.relative_to(pool_dir)
-        parts = rel.parts
-        print(f"  Pkg  {'/'.join(parts)}")
-
-        ctrl_text = control_file_contents(str(deb))
-        if ctrl_text is None:
-            continue
-
-        info     = parse_control(ctrl_text)
-        pkg_name = info.get('Package', deb.stem.split('_')[0])
-        pkg_ver  = info.get('Version', '')
-        pkg_arch = info.get('Architecture', 'aarch64')
-
-        if pkg_arch not in SUPPORTED_ARCHES:
-            print(f"    WARNING: Unsupported arch '{pkg_arch}' - skipping")
-            continue
-        encountered_arches.add(pkg_arch)
-
-        size          = deb.stat().st_size
-        is_large      = size >= LARGE_FILE_THRESHOLD
-
-        # Large files: use Release URL as Filename, will be deleted from pool/ after indexing
-        if is_large and release_urls and deb.name in release_urls:
-            filename_path = release_urls[deb.name]
-            print(f"  Large {deb.name} ({size//1024//1024} MB) → Release URL")
-        else:
-            filename_path = 'pool/main/' + '/'.join(parts)
-            if is_large:
-                print(f"  Large {deb.name} ({size//1024//1024} MB) → pool/ (no release URL — add --release TAG)")
-
-        # Build Packages entry
-        block = []
-        added = set()
-        for key in PRIORITY_KEYS:
-            if key in info:
-                block.append(f"{key}: {info[key]}")
-                added.add(key)
-        for key, val in info.items():
-            if key not in added and key not in COMPUTED:
-                block.append(f"{key}: {val}")
-        block.append(f"Filename: {filename_path}")
-        block.append(f"Size: {size}")
-        for algo in HASHES:
-            block.append(f"{hash_label(algo)}: {hash_file(str(deb), algo)}")
-        entries.append('\n'.join(block))
-
-        # Build packages.json map  { "m": { "micro": [{...}] } }
-        if len(parts) >= 3:
-            letter, pkgdir = parts[0], parts[1]
-        elif len(parts) == 2:
-            letter, pkgdir = parts[0], pkg_name
-        else:
-            letter = pkg_name[0].lower() if pkg_name else '.'
-            pkgdir = pkg_name
-
-        folder_map.setdefault(letter, {}).setdefault(pkgdir, []).append({
-            'name':    deb.name,
-            'path':    filename_path,
-            'size':    size,
-            'package': pkg_name,
-            'version': pkg_ver,
-            'desc':    info.get('Description', '').split('\n')[0],
-            'release': is_large and release_urls and deb.name in release_urls,
-        })
+    # Unchanged debs (same size + mtime) reuse cached control fields and hashes
+    cache      = load_index_cache(repo_root)
+    new_cache  = {}
+    reused     = 0
+    rel_keys   = [deb.relative_to(pool_dir).as_posix() for deb in deb_files]
+    prefetched = prefetched_controls or {}
+    stats      = [e.stat() for e in deb_entries]
+
+    # Large debs promoted to release.json or uploaded as Release assets but still
+    # in pool/ — reuse the digests recorded there (same name + size) instead of
+    # reading 90+ MB again
+    release_entries = load_release_json(repo_root)
+    rel_by_name     = {e.get('file'): e for e in release_entries}
+    known_hashes    = []
+    for deb, st in zip(deb_files, stats):
+        r = rel_by_name.get(deb.name)
+        if not (r and r.get('size') == st.st_size) and st.st_size >= LARGE_FILE_THRESHOLD:
+            r = (release_urls or {}).get(deb.name)
+        known_hashes.append({algo: r[algo] for algo in HASHES if r.get(algo)}
+                            if r and r.get('size') == st.st_size else None)
+
+    # Each .deb is independent: extract + hash them in parallel, merge in order
+    with deb_executor() as ex:
+        results = ex.map(process_deb, deb_files, itertools.repeat(pool_dir),
+                         itertools.repeat(release_urls),
+                         [prefetched.get(str(deb)) or cache.get(k)
+                          for deb, k in zip(deb_files, rel_keys)],
+                         stats, known_hashes, chunksize=4)
+        for key, (log, result) in zip(rel_keys, results):
+            sys.stdout.write(log)
+            if result is None:
+                continue
+            entry, (letter, pkgdir, item), pkg_arch, record, from_cache = result
+            entries.append(entry)
+            folder_map.setdefault(letter, {}).setdefault(pkgdir, []).append(item)
+            encountered_arches.add(pkg_arch)
+            new_cache[key] = record
+            reused += from_cache
+    save_index_cache(repo_root, new_cache)
+    print(f"  OK   {INDEX_CACHE} ({reused} of {len(new_cache)} reused)")
 
     # ── Process release.json entries (large files on GitHub Releases) ──────────
-    release_entries = load_release_json(repo_root)
-    for re in release_entries:
-        filename  = re.get('file', '')
-        url       = re.get('url', '')
-        size      = re.get('size', 0)
-        ctrl_text = re.get('control', '')
+    for rel in release_entries:
+        filename  = rel.get('file', '')
+        url       = rel.get('url', '')
+        size      = rel.get('size', 0)
+        ctrl_text = rel.get('control', '')
 
         if not url:
             print(f"  WARNING: release.json entry '{filename}' has no url — skipping")
             continue
 
         info = parse_control(ctrl_text) if ctrl_text else {}
-        pkg_name = re.get('package') or info.get('Package', filename.split('_')[0])
-        pkg_ver  = re.get('version') or info.get('Version', '')
-        pkg_arch = re.get('arch')    or info.get('Architecture', 'all')
+        pkg_name = rel.get('package') or info.get('Package', filename.split('_')[0])
+        pkg_ver  = rel.get('version') or info.get('Version', '')
+        pkg_arch = rel.get('arch')    or info.get('Architecture', 'all')
 
         print(f"  Release {filename} ({size//1024//1024} MB) → {url}")
         encountered_arches.add(pkg_arch)
 
-        PRIORITY_KEYS_R = [
-            'Package', 'Version', 'Architecture', 'Maintainer',
-            'Installed-Size', 'Depends', 'Pre-Depends', 'Recommends',
-            'Suggests', 'Conflicts', 'Breaks', 'Replaces', 'Provides',
-            'Homepage', 'Description'
-        ]
-        block = []
-        added = set()
-        if ctrl_text:
-            parsed = parse_control(ctrl_text)
-            for key in PRIORITY_KEYS_R:
-                if key in parsed:
-                    block.append(f"{key}: {parsed[key]}")
-                    added.add(key)
-            for key, val in parsed.items():
-                if key not in added and key not in COMPUTED:
-                    block.append(f"{key}: {val}")
-        else:
-            block.append(f"Package: {pkg_name}")
-            block.append(f"Version: {pkg_ver}")
-            block.append(f"Architecture: {pkg_arch}")
-
-        block.append(f"Filename: {url}")
-        block.append(f"Size: {size}")
-        block.append(f"MD5Sum: {re.get('md5', '')}")
-        block.append(f"SHA256: {re.get('sha256', '')}")
-        entries.append('\n'.join(block))
+        # No control text recorded: the three fields we know are all there is
+        if not info:
+            info = {'Package': pkg_name, 'Version': pkg_ver, 'Architecture': pkg_arch}
+        entries.append(render_entry(info, url, size, rel))
 
         # Add to packages.json
         letter = pkg_name[0].lower() if pkg_name else 'z'
@@ -397,28 +720,40 @@ def build_packages(pool_dir, repo_root, release_urls=None):
             'release': True,
         })
 
-    # Write Packages
-    packages_content = '\n\n'.join(entries) + ('\n' if entries else '')
-    pkg_file.write_text(packages_content, encoding='utf-8')
+    # Write Packages and Packages.gz from the same bytes — no re-read.
+    # Entries are already encoded; one C-level join, one compress call.
+    data = b'\n'.join(entries)
+    write_atomic(pkg_file, data)
+    write_gzip(pkggz, data, gzip_level)
     print(f"  OK   Packages ({len(entries)} entries)")
-
-    # Write Packages.gz
-    with open(pkg_file, 'rb') as fi, gzip.open(pkggz, 'wb', compresslevel=9) as fo:
-        shutil.copyfileobj(fi, fo)
     print(f"  OK   Packages.gz")
 
     # Write packages.json
-    (repo_root / 'packages.json').write_text(json.dumps(folder_map, indent=2), encoding='utf-8')
+    # Compact by default — it's only read by the web UI
+    write_atomic(repo_root / 'packages.json', dump_json(folder_map, pretty=pretty_json))
     print(f"  OK   packages.json")
 
     return bin_dir, pkg_file, pkggz, encountered_arches
 
 
-def build_release(repo_root, bin_dir, pkg_file, pkggz, arches):
-    """Generate dists/stable/Release with checksums."""
+def release_date(when=None):
+    """Release 'Date:' value for when (default: now), always in UTC."""
+    when = when or datetime.datetime.now(datetime.timezone.utc)
+    return when.astimezone(datetime.timezone.utc).strftime('%a, %d %b %Y %H:%M:%S UTC')
+
+
+# Release's Date: line — the one part that changes on every run
+_DATE_RE = re.compile(rb'^Date: .*\n', re.MULTILINE)
+
+
+def build_release(repo_root, bin_dir, pkg_file, pkggz, arches, date=None):
+    """Generate dists/stable/Release with checksums.
+    date: preformatted Date: value (see release_date); defaults to now.
+    If the existing Release differs only in its Date, it is left as is (so its
+    signatures stay valid). Returns True if Release was (re)written."""
     dist_dir     = repo_root / 'dists' / CODENAME
     release_file = dist_dir / 'Release'
-    now          = datetime.datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S UTC')
+    now          = date or release_date()
     arch_str     = ' '.join(sorted(arches)) if arches else 'aarch64'
 
     lines = [
@@ -432,58 +767,174 @@ def build_release(repo_root, bin_dir, pkg_file, pkggz, arches):
         f"Description: {DESCRIPTION}",
     ]
 
+    # Read each index file once for all algos; one stat for size + hashing
+    files = []
+    for fpath in [pkg_file, pkggz]:
+        st = fpath.stat()
+        files.append((fpath.relative_to(dist_dir), st.st_size,
+                      hash_file_multi(str(fpath), HASHES, st)))
+
     for algo in HASHES:
         lines.append(f"{hash_label(algo)}:")
-        for fpath in [pkg_file, pkggz]:
-            rel  = fpath.relative_to(dist_dir)
-            size = fpath.stat().st_size
-            h    = hash_file(str(fpath), algo)
-            lines.append(f" {h} {size:>10} {rel}")
+        for rel, size, digests in files:
+            lines.append(f" {digests[algo]} {size:>10} {rel}")
 
-    release_file.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    content = ('\n'.join(lines) + '\n').encode('utf-8')
+    try:
+        old = release_file.read_bytes()
+    except OSError:
+        old = None
+    if old is not None and _DATE_RE.sub(b'', old) == _DATE_RE.sub(b'', content):
+        print(f"  OK   Release (unchanged)")
+        return False
+    write_atomic(release_file, content)
     print(f"  OK   Release")
+    return True
 
 
-def import_debs(input_path, pool_dir):
-    """Copy .deb files from input_path into pool/main/letter/pkgname/.
-    Old versions of the same package are automatically removed."""
-    debs = sorted(Path(input_path).glob('*.deb'))
-    if not debs:
-        sys.exit(f"No .deb files found in {input_path}")
+def link_or_copy(src, dst):
+    """Put src at dst: a hardlink when on the same filesystem (zero-copy),
+    else copy_file_range (in-kernel, a reflink on Btrfs/XFS), else
+    shutil.copyfile (sendfile on Linux). Metadata is not needed.
+    Either way it lands in a sibling .tmp file that is renamed over dst, so an
+    existing dst — possibly a hardlink to an earlier input file — is replaced,
+    never written through, and a failed copy never leaves a partial dst."""
+    tmp = dst + '.tmp'
+    try:
+        os.unlink(tmp)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, tmp)
+    except OSError:
+        try:
+            _copy_file(src, tmp)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    os.replace(tmp, dst)
 
-    copied = skipped = replaced = 0
-    for deb in debs:
-        ctrl = control_file_contents(str(deb))
-        if ctrl:
-            info    = parse_control(ctrl)
-            pkgname = info.get('Package', deb.stem.split('_')[0])
-        else:
-            pkgname = deb.stem.split('_')[0]
 
-        letter     = pkgname[0].lower()
-        target_dir = pool_dir / letter / pkgname
-        target_dir.mkdir(parents=True, exist_ok=True)
-        target = target_dir / deb.name
+def _copy_file(src, dst):
+    """Copy src's bytes to a new file dst: copy_file_range where the platform
+    and filesystem pair support it, else shutil.copyfile."""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fi, open(dst, 'wb') as fo:
+                while os.copy_file_range(fi.fileno(), fo.fileno(), 1 << 30):
+                    pass
+            return
+        except OSError:
+            pass  # e.g. not supported by this filesystem pair
+    shutil.copyfile(src, dst)
+
+
+def _read_import_info(deb):
+    """Parsed control fields of an input .deb, or None if it has no readable control."""
+    log  = io.StringIO()
+    ctrl = read_deb_control(str(deb), log)
+    return log.getvalue(), parse_control(ctrl) if ctrl else None
+
+
+def _import_package(target_dir, debs):
+    """Place the input debs of one package into target_dir, in order; each one
+    replaces whatever other .deb the folder holds. Runs in a worker thread, so
+    output goes to a private buffer.
+    Returns (log, copied, skipped, replaced, { copied_path: {size, mtime_ns, info} })."""
+    log = io.StringIO()
+    copied = skipped = replaced = 0
+    imported = {}
+    letter, pkgname = target_dir.parent.name, target_dir.name
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for deb, info in debs:
+        target   = target_dir / deb.name
+        src_size = deb.stat().st_size
 
         # Remove any existing .deb for this package (old versions)
         existing = [f for f in target_dir.glob('*.deb') if f != target]
         for old_deb in existing:
             old_deb.unlink()
-            print(f"  Removed {letter}/{pkgname}/{old_deb.name}")
+            imported.pop(str(old_deb), None)
+            print(f"  Removed {letter}/{pkgname}/{old_deb.name}", file=log)
             replaced += 1
 
         # Skip if exact same file already exists
-        if target.exists() and target.stat().st_size == deb.stat().st_size:
-            skipped += 1
-            continue
-
-        shutil.copy2(str(deb), str(target))
-        size_mb = deb.stat().st_size / 1024 / 1024
-        flag = " [LARGE]" if deb.stat().st_size >= LARGE_FILE_THRESHOLD else ""
-        print(f"  Copied  {letter}/{pkgname}/{deb.name} ({size_mb:.1f} MB){flag}")
+        try:
+            if target.stat().st_size == src_size:
+                skipped += 1
+                continue
+        except FileNotFoundError:
+            pass
+
+        link_or_copy(str(deb), str(target))
+        size_mb = src_size / 1024 / 1024
+        flag = " [LARGE]" if src_size >= LARGE_FILE_THRESHOLD else ""
+        print(f"  Copied  {letter}/{pkgname}/{deb.name} ({size_mb:.1f} MB){flag}", file=log)
         copied += 1
 
+        if info:
+            st = target.stat()
+            imported[str(target)] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                                     'info': info}
+    return log.getvalue(), copied, skipped, replaced, imported
+
+
+def import_debs(input_path, pool_dir):
+    """Copy .deb files from input_path into pool/main/letter/pkgname/.
+    Old versions of the same package are automatically removed.
+    Control reads and copies run on 4 threads (both release the GIL); debs of
+    the same package stay together in one worker, in sorted order.
+    Returns { copied_path: {size, mtime_ns, info} } for build_packages."""
+    debs = sorted(Path(input_path).glob('*.deb'))
+    if not debs:
+        sys.exit(f"No .deb files found in {input_path}")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as ex:
+        # Package name decides the target folder, so read all controls first
+        groups = {}
+        for deb, (log, info) in zip(debs, ex.map(_read_import_info, debs)):
+            print(log, end='')
+            pkgname = (info or {}).get('Package', deb.stem.split('_')[0])
+            target_dir = pool_dir / pkgname[0].lower() / pkgname
+            groups.setdefault(target_dir, []).append((deb, info))
+
+        copied = skipped = replaced = 0
+        imported = {}
+        for log, c, s, r, imp in ex.map(_import_package, groups.keys(), groups.values()):
+            print(log, end='')
+            copied   += c
+            skipped  += s
+            replaced += r
+            imported.update(imp)
+
     print(f"\n  Copied: {copied}   Replaced: {replaced}   Skipped: {skipped} (unchanged)")
+    return imported
+
+
+# InRelease: armor header, "Hash:" lines, blank line, signed text, signature block
+_CLEARSIGNED_RE = re.compile(rb'-----BEGIN PGP SIGNED MESSAGE-----\n(?:[^\n]+\n)*\n'
+                             rb'(.*\n)-----BEGIN PGP SIGNATURE-----\n', re.DOTALL)
+
+
+def signatures_current(repo_root):
+    """True if InRelease and Release.gpg were made from the Release now on disk:
+    InRelease's clearsigned text is exactly Release, and Release.gpg is not older
+    than Release. Anything missing or unreadable counts as stale."""
+    dist_dir = repo_root / 'dists' / CODENAME
+    release  = dist_dir / 'Release'
+    try:
+        data      = release.read_bytes()
+        inrelease = (dist_dir / 'InRelease').read_bytes()
+        if (dist_dir / 'Release.gpg').stat().st_mtime_ns < release.stat().st_mtime_ns:
+            return False
+    except OSError:
+        return False
+    m = _CLEARSIGNED_RE.match(inrelease)
+    # Undo dash-escaping ("- " before lines starting with "-")
+    return bool(m) and re.sub(rb'(?m)^- ', b'', m.group(1)) == data
 
 
 def sign_release(repo_root):
@@ -494,13 +945,13 @@ def sign_release(repo_root):
         print("  ERROR: Release file not found - cannot sign")
         return False
 
-    # Check GPG is available
-    if run("gpg --version") is None:
+    # Check GPG is available (PATH lookup — no need to start gpg for this)
+    if shutil.which('gpg') is None:
         print("  WARNING: gpg not found - skipping signing")
         return False
 
     # Check a secret key exists
-    keys = run("gpg --list-secret-keys --keyid-format=long")
+    keys = run(['gpg', '--list-secret-keys', '--keyid-format=long'])
     if not keys:
         print("  WARNING: No GPG secret key found - skipping signing")
         print("  Tip: run 'gpg --gen-key' to create one")
@@ -509,15 +960,17 @@ def sign_release(repo_root):
     inrelease = repo_root / 'dists' / CODENAME / 'InRelease'
     releasegpg = repo_root / 'dists' / CODENAME / 'Release.gpg'
 
-    # InRelease = clearsigned (modern apt)
-    r1 = run(f"gpg --batch --yes --armor --clearsign "
-             f"-o {inrelease} {release}")
-
-    # Release.gpg = detached signature (older apt)
-    r2 = run(f"gpg --batch --yes --armor --detach-sign "
-             f"-o {releasegpg} {release}")
+    # Both signatures at once — gpg-agent is already warm from the key listing.
+    # InRelease = clearsigned (modern apt), Release.gpg = detached (older apt)
+    procs = [
+        subprocess.Popen(['gpg', '--batch', '--yes', '--armor', mode,
+                          '-o', str(out), str(release)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for mode, out in (('--clearsign', inrelease), ('--detach-sign', releasegpg))
+    ]
+    ok = all([p.wait() == 0 for p in procs])
 
-    if inrelease.exists() and releasegpg.exists():
+    if ok and inrelease.exists() and releasegpg.exists():
         print(f"  OK   InRelease  (clearsign)")
         print(f"  OK   Release.gpg (detached)")
         return True
@@ -532,14 +985,14 @@ def cleanup_large_files(pool_dir):
     Delete large .deb files from pool/ after they have been indexed.
     They are hosted on GitHub Releases so they don't need to be in the repo.
     """
-    import glob as _glob
-    deb_files = [
-        Path(p) for p in _glob.glob(str(pool_dir / '**' / '*.deb'), recursive=True)
-    ]
+    # Collect first (same scandir walk as build_packages) — folders get removed below
+    deb_entries = list(find_debs(pool_dir))
     removed = 0
-    for deb in deb_files:
-        if deb.stat().st_size >= LARGE_FILE_THRESHOLD:
-            size_mb = deb.stat().st_size / 1024 / 1024
+    for e in deb_entries:
+        deb  = Path(e.path)
+        size = e.stat().st_size
+        if size >= LARGE_FILE_THRESHOLD:
+            size_mb = size / 1024 / 1024
             # Also remove empty parent folder if it becomes empty
             pkg_dir = deb.parent
             deb.unlink()
@@ -570,6 +1023,12 @@ def main():
                         help='Add a large .deb to release.json: --add-release file.deb https://...')
     parser.add_argument('--no-sign', action='store_true',
                         help='Skip GPG signing')
+    parser.add_argument('--gzip-level', type=int, default=GZIP_LEVEL, choices=range(1, 10),
+                        metavar='N', help=f'Packages.gz compression level 1-9 (default: {GZIP_LEVEL}). '
+                             'pigz is used when on PATH; otherwise levels 1-3 '
+                             'use ISA-L if isal is installed, else zlib')
+    parser.add_argument('--pretty-json', action='store_true',
+                        help='Write packages.json indented instead of compact')
     args = parser.parse_args()
 
     repo_root = Path(args.repo).resolve()
@@ -597,9 +1056,10 @@ def main():
         print()
         return
 
+    imported = {}
     if args.input:
         print(f"Import  Importing from {args.input} ...")
-        import_debs(args.input, pool_dir)
+        imported = import_debs(args.input, pool_dir)
         print()
 
     # Fetch release asset URLs if --release tag given
@@ -610,16 +1070,21 @@ def main():
         print()
 
     print("Build   Scanning pool/main/ ...")
-    bin_dir, pkg_file, pkggz, arches = build_packages(pool_dir, repo_root, release_urls)
+    bin_dir, pkg_file, pkggz, arches = build_packages(pool_dir, repo_root, release_urls,
+                                                      args.gzip_level, imported,
+                                                      args.pretty_json)
 
     print()
     print("Build   Generating Release ...")
-    build_release(repo_root, bin_dir, pkg_file, pkggz, arches)
+    build_release(repo_root, bin_dir, pkg_file, pkggz, arches, release_date())
 
     if not args.no_sign:
         print()
         print("Sign    Signing Release with GPG ...")
-        sign_release(repo_root)
+        if signatures_current(repo_root):
+            print("  OK   InRelease / Release.gpg already sign this Release — kept")
+        else:
+            sign_release(repo_root)
 
     # ── Cleanup: delete large files from pool/ (they live on GitHub Releases) ──
     print()